@@ -0,0 +1,284 @@
+import base64
+import copy
+import json
+import multiprocessing
+from collections import defaultdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from google.analytics.data_v1beta.types import (DimensionValue, MetricValue, Row,
+                                                  RunRealtimeReportResponse, RunReportResponse)
+
+from benchmarks.stores import SyntheticStore, build_store
+
+# ==============================================================================
+# GIẢ LẬP STREAMLIT
+# ==============================================================================
+
+class SessionState(dict):
+    """A dict that also allows attribute access, like st.session_state."""
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError as e:
+            raise AttributeError(key) from e
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+class StreamlitShim:
+    """
+    Stands in for the `st` module inside benchmarked code.
+
+    `cache_data` is a pass-through so every call does the real work, and `error`
+    raises instead of rendering, so a failing fetch cannot pass for a fast one.
+    """
+    def __init__(self):
+        self.session_state = SessionState()
+
+    def cache_data(self, func=None, **kwargs):
+        if func is None:
+            return lambda f: f
+        return func
+
+    def error(self, message):
+        raise RuntimeError(message)
+
+# ==============================================================================
+# GIẢ LẬP GOOGLE ANALYTICS
+# ==============================================================================
+
+class FakeGAClient:
+    """
+    In-process replacement for BetaAnalyticsDataClient backed by a SyntheticStore.
+
+    Responses are real protobuf messages built from the request's dimensions and
+    ranges, and are memoised so repeated calls only pay for reading them.
+    """
+    def __init__(self, store: SyntheticStore):
+        self.store = store
+        self.calls = 0
+        self._responses = {}
+
+    def run_realtime_report(self, request):
+        self.calls += 1
+        dimensions = tuple(d.name for d in request.dimensions)
+        metrics = tuple(m.name for m in request.metrics)
+        ranges = tuple((r.start_minutes_ago, r.end_minutes_ago) for r in request.minute_ranges) or ((29, 0),)
+        key = ("realtime", dimensions, metrics, ranges)
+        if key not in self._responses:
+            rows = self._realtime_rows(dimensions, metrics, ranges)
+            self._responses[key] = RunRealtimeReportResponse(rows=rows, row_count=len(rows))
+        return self._responses[key]
+
+    def run_report(self, request):
+        self.calls += 1
+        dimensions = tuple(d.name for d in request.dimensions)
+        metrics = tuple(m.name for m in request.metrics)
+        ranges = tuple((r.start_date, r.end_date) for r in request.date_ranges)
+        key = ("report", dimensions, metrics, ranges)
+        if key not in self._responses:
+            rows = self._report_rows(dimensions, metrics, ranges[0])[:request.limit or 10000]
+            self._responses[key] = RunReportResponse(rows=rows, row_count=len(rows))
+        return self._responses[key]
+
+    def _realtime_rows(self, dimensions, metrics, ranges):
+        totals = defaultdict(lambda: [0, 0])
+        for index, (start, end) in enumerate(ranges):
+            for title, minutes_ago, users, views in self.store.realtime_rows:
+                if not end <= minutes_ago <= start:
+                    continue
+                values = {"unifiedScreenName": title, "minutesAgo": f"{minutes_ago:02d}"}
+                key = tuple(values[d] for d in dimensions)
+                if len(ranges) > 1:
+                    key += (f"date_range_{index}",)
+                totals[key][0] += users
+                totals[key][1] += views
+        return [_row(key, [totals[key][0] if m == "activeUsers" else totals[key][1] for m in metrics])
+                for key in sorted(totals, key=lambda k: -totals[k][0])]
+
+    def _report_rows(self, dimensions, metrics, date_range):
+        start, end = (datetime.strptime(d, "%Y-%m-%d").date() for d in date_range)
+        totals = defaultdict(lambda: [0, 0])
+        for title, day, sessions, users in self.store.daily_rows:
+            if not start <= day <= end:
+                continue
+            values = {"pageTitle": title, "date": day.strftime("%Y%m%d"), "week": day.strftime("%U")}
+            key = tuple(values[d] for d in dimensions)
+            totals[key][0] += sessions
+            totals[key][1] += users
+        return [_row(key, [totals[key][0] if m == "sessions" else totals[key][1] for m in metrics])
+                for key in sorted(totals, key=lambda k: -totals[k][0])]
+
+def _row(dimension_values, metric_values) -> Row:
+    return Row(dimension_values=[DimensionValue(value=v) for v in dimension_values],
+               metric_values=[MetricValue(value=str(v)) for v in metric_values])
+
+# ==============================================================================
+# GIẢ LẬP SHOPIFY
+# ==============================================================================
+
+SHOPIFY_DEFAULT_LIMIT = 50
+SHOPIFY_MAX_LIMIT = 250
+
+def _parse_shopify_time(value: str):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+def _make_handler(store: SyntheticStore, creds: dict):
+    orders_path = f"/admin/api/{creds['api_version']}/orders.json"
+    public_origin = f"https://{creds['store_url']}"
+
+    class ShopifyOrdersHandler(BaseHTTPRequestHandler):
+        """Serves a cursor-paginated orders.json like the Shopify Admin REST API."""
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path != orders_path:
+                return self._send(404, {"errors": "Not Found"})
+            if self.headers.get("X-Shopify-Access-Token") != creds["access_token"]:
+                return self._send(401, {"errors": "[API] Invalid API key or access token"})
+            query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+
+            if "page_info" in query:
+                cursor = json.loads(base64.urlsafe_b64decode(query["page_info"]))
+                unexpected = set(query) - {"page_info", "limit", "fields"}
+                if unexpected:
+                    return self._send(400, {"errors": {"page_info": [f"{', '.join(sorted(unexpected))} cannot be passed with page_info"]}})
+            else:
+                cursor = {"min": query.get("created_at_min"), "max": query.get("created_at_max"), "offset": 0,
+                          "limit": query.get("limit"), "fields": query.get("fields")}
+            limit = min(int(query.get("limit") or cursor["limit"] or SHOPIFY_DEFAULT_LIMIT), SHOPIFY_MAX_LIMIT)
+            fields = query.get("fields") or cursor["fields"]
+
+            # Shopify trả về đơn mới nhất trước
+            matching = store.orders_between(_parse_shopify_time(cursor["min"]), _parse_shopify_time(cursor["max"]))
+            newest = len(matching) - cursor["offset"]
+            page = matching[max(0, newest - limit):max(0, newest)][::-1]
+            if fields:
+                wanted = fields.split(",")
+                page = [{k: order[k] for k in wanted if k in order} for order in page]
+
+            headers = {}
+            if newest - limit > 0:
+                next_cursor = dict(cursor, offset=cursor["offset"] + limit, limit=limit, fields=fields)
+                page_info = base64.urlsafe_b64encode(json.dumps(next_cursor).encode()).decode()
+                next_query = urlencode({"limit": limit, "page_info": page_info})
+                headers["Link"] = f'<{public_origin}{orders_path}?{next_query}>; rel="next"'
+            self._send(200, {"orders": page}, headers)
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+    return ShopifyOrdersHandler
+
+def _serve_shopify(scale, seed, now, creds, conn):
+    store = build_store(scale, seed=seed, now=now)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(store, creds))
+    conn.send(server.server_address[1])
+    conn.close()
+    server.serve_forever()
+
+class ShopifyStub:
+    """
+    Local HTTP server for the Shopify orders endpoint, run in a child process.
+
+    The child rebuilds the same SyntheticStore from its scale, seed and anchor time,
+    so the JSON encoding work and memory of the stub stay out of the measurements.
+    Use `requests_module` to get a drop-in for `requests` that routes the store's
+    https:// URLs (including `Link` headers) to the stub.
+    """
+    def __init__(self, store: SyntheticStore, creds: dict):
+        self.store = store
+        self.creds = creds
+        self.base_url = None
+        self._process = None
+
+    def __enter__(self):
+        parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+        self._process = multiprocessing.Process(
+            target=_serve_shopify, args=(self.store.scale, self.store.seed, self.store.now, self.creds, child_conn), daemon=True)
+        self._process.start()
+        if not parent_conn.poll(120):
+            self._process.terminate()
+            raise RuntimeError("Shopify stub did not start within 120 seconds.")
+        self.base_url = f"http://127.0.0.1:{parent_conn.recv()}"
+        return self
+
+    def __exit__(self, *exc_info):
+        self._process.terminate()
+        self._process.join()
+
+    def requests_module(self):
+        return routed_requests(f"https://{self.creds['store_url']}", self.base_url)
+
+class _RerouteAdapter(HTTPAdapter):
+    def __init__(self, origin: str, target: str):
+        super().__init__()
+        self.origin, self.target = origin, target
+
+    def send(self, request, **kwargs):
+        request.url = self.target + request.url[len(self.origin):]
+        return super().send(request, **kwargs)
+
+def routed_requests(origin: str, target: str):
+    """
+    Returns a stand-in for the `requests` module covering what app.py and fetcher.py
+    use (`get` and `utils`), with URLs under `origin` sent to `target` instead. Like
+    `requests.get`, every call opens a fresh session, so connection setup is still
+    part of the cost.
+    """
+    def get(url, params=None, **kwargs):
+        with requests.Session() as session:
+            session.mount(origin, _RerouteAdapter(origin, target))
+            return session.get(url, params=params, **kwargs)
+
+    return SimpleNamespace(get=get, utils=requests.utils)
+
+# ==============================================================================
+# GIẢ LẬP SUPABASE
+# ==============================================================================
+
+class FakeSupabase:
+    """
+    In-memory stand-in for the supabase Client, covering only the
+    `table(...).update(...).eq(...).execute()` chain fetcher.main uses. Payloads go
+    through a JSON round trip, as they would on the wire, so non-serialisable data
+    fails here too.
+    """
+    def __init__(self, tables: dict = None):
+        self.tables = copy.deepcopy(tables or {})
+
+    def table(self, name: str):
+        return _FakeUpdate(self.tables.setdefault(name, []))
+
+class _FakeUpdate:
+    def __init__(self, rows: list):
+        self.rows, self.payload, self.filters = rows, None, []
+
+    def update(self, payload):
+        self.payload = json.loads(json.dumps(payload))
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def execute(self):
+        matches = [row for row in self.rows if all(row.get(c) == v for c, v in self.filters)]
+        for row in matches:
+            row.update(self.payload)
+        return SimpleNamespace(data=json.loads(json.dumps(matches)), count=None)
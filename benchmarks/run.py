@@ -0,0 +1,418 @@
+"""
+Offline benchmark and replay harness for the dashboard's data paths.
+
+Runs fetch_realtime_data, fetch_historical_page_report (app.py),
+NotificationManager.check_for_new_sales and fetcher.main end-to-end against
+synthetic stores, with an in-process GA client, a local Shopify HTTP stub and an
+in-memory Supabase. Reports latency, throughput and peak traced memory, and
+compares them with benchmarks/baselines.json. Latency is checked on a score
+normalised by a fixed calibration workload, since wall time on a shared machine
+drifts by tens of percent between runs.
+
+Run from the repository root:
+    python -m benchmarks.run                          # every scale, check baselines
+    python -m benchmarks.run --scale small medium     # a subset
+    python -m benchmarks.run --update-baselines       # record new baselines (5 rounds)
+"""
+import argparse
+import ast
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import fetcher
+import notification_manager
+from benchmarks.fakes import SHOPIFY_DEFAULT_LIMIT, FakeGAClient, FakeSupabase, ShopifyStub, StreamlitShim
+from benchmarks.stores import SCALES, build_store
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BASELINES_PATH = Path(__file__).resolve().parent / "baselines.json"
+
+PROPERTY_ID = "123456789"
+SHOPIFY_CREDS = {"store_url": "bench-store.myshopify.com", "api_version": "2024-01", "access_token": "shpat_benchmark"}
+REPLAY_MINUTES = 60
+# Khối lượng công việc CPU cố định dùng để chuẩn hoá thời gian theo tốc độ máy lúc đo
+CALIBRATION_PAYLOAD = [{"id": i, "title": f"Product {i} 🌻", "price": f"{i * 1.5:.2f}", "items": list(range(i % 7))}
+                       for i in range(2000)]
+
+# Các hàm lấy dữ liệu trong app.py được benchmark (cùng các hàm tiện ích chúng gọi)
+APP_FUNCTIONS = ("extract_core_and_symbol", "get_marketer_from_page_title", "fetch_shopify_realtime_purchases_rest",
+                 "fetch_realtime_data", "fetch_shopify_historical_purchases_by_title", "fetch_historical_page_report")
+# Các import chỉ phục vụ giao diện, không cần (và không nên) chạy khi benchmark
+UI_MODULES = ("streamlit", "streamlit_cookies_manager", "plotly")
+
+# ==============================================================================
+# CÁC HÀM TIỆN ÍCH
+# ==============================================================================
+
+def load_app_functions(globals_: dict) -> dict:
+    """
+    Loads the data functions from app.py without running the Streamlit script.
+
+    Only the non-UI imports and the functions in APP_FUNCTIONS are executed, in a namespace
+    where `globals_` (fakes for st, ga_client, requests, ...) replace the module-level
+    clients app.py would create. Code objects keep app.py's filename and line numbers.
+    """
+    path = REPO_ROOT / "app.py"
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)) and not _is_ui_import(node)]
+    functions = [node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name in APP_FUNCTIONS]
+    missing = set(APP_FUNCTIONS) - {node.name for node in functions}
+    if missing:
+        raise RuntimeError(f"app.py no longer defines: {', '.join(sorted(missing))}")
+
+    namespace = {"__name__": "app"}
+    exec(compile(ast.Module(body=imports, type_ignores=[]), str(path), "exec"), namespace)
+    namespace.update(globals_)
+    exec(compile(ast.Module(body=functions, type_ignores=[]), str(path), "exec"), namespace)
+    return namespace
+
+def _is_ui_import(node) -> bool:
+    names = [node.module] if isinstance(node, ast.ImportFrom) else [alias.name for alias in node.names]
+    return all(name.split(".")[0] in UI_MODULES for name in names)
+
+def order_details(order: dict, store) -> dict:
+    """Shapes a Shopify order the way NotificationManager.check_for_new_sales expects."""
+    titles = [item["title"] for item in order["line_items"]]
+    shipping = float(order["total_shipping_price_set"]["shop_money"]["amount"])
+    return {
+        "id": order["id"],
+        "marketer": fetcher.get_marketer_from_page_title(titles[0], store.page_title_map, store.symbols),
+        "total_revenue": float(order["subtotal_price"]) + shipping,
+        "products": titles,
+    }
+
+def _check(condition: bool, message: str):
+    if not condition:
+        raise RuntimeError(message)
+
+def _quantity(orders: list) -> int:
+    return sum(item["quantity"] for order in orders for item in order["line_items"])
+
+def _realtime_window(store) -> list:
+    """
+    The orders a realtime fetch started now should receive: created in the last 30
+    minutes (cut at whole seconds, as app.py and fetcher.py do), newest 50 only since
+    neither passes `limit` nor follows pagination.
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(minutes=30)).replace(microsecond=0)
+    return store.orders_between(cutoff)[-SHOPIFY_DEFAULT_LIMIT:]
+
+# ==============================================================================
+# CÁC KỊCH BẢN
+# ==============================================================================
+# Mỗi kịch bản là một context manager nhận ctx và yield (run, work, unit):
+# run() chạy một lần, work là số đơn vị công việc mỗi lần chạy để tính throughput.
+
+@contextlib.contextmanager
+def realtime_scenario(ctx):
+    fetch_realtime_data = ctx.app["fetch_realtime_data"]
+
+    def run():
+        # Cửa sổ 30 phút có thể trượt qua một đơn trong lúc gọi, nên chấp nhận cả hai đầu
+        expected = {_quantity(_realtime_window(ctx.store))}
+        result = fetch_realtime_data()
+        expected.add(_quantity(_realtime_window(ctx.store)))
+        _check(result[0] is not None, f"fetch_realtime_data failed: {result[6]}")
+        _check(result[3] in expected, f"fetch_realtime_data counted {result[3]} purchases, expected {sorted(expected)}.")
+
+    yield run, len({row[0] for row in ctx.store.realtime_rows}), "pages"
+
+def _historical_scenario(segment: str):
+    @contextlib.contextmanager
+    def scenario(ctx):
+        fetch_historical_page_report = ctx.app["fetch_historical_page_report"]
+        orders = ctx.store.history_orders()
+        expected_purchases = _quantity(orders)
+
+        def run():
+            all_data_df, _, _, shopify_df = fetch_historical_page_report(ctx.store.first_day.strftime("%Y-%m-%d"), ctx.store.last_day.strftime("%Y-%m-%d"), segment)
+            _check(not all_data_df.empty, "fetch_historical_page_report returned no rows.")
+            _check(shopify_df["Purchases"].sum() == expected_purchases,
+                   f"fetch_historical_page_report counted {shopify_df['Purchases'].sum()} purchases, expected {expected_purchases}.")
+
+        yield run, len(orders), "orders"
+    return scenario
+
+@contextlib.contextmanager
+def notifications_scenario(ctx):
+    """Replays the last REPLAY_MINUTES minutes of orders, one dashboard refresh per minute."""
+    details = {}
+    windows = []
+    for step in range(REPLAY_MINUTES):
+        refreshed_at = ctx.store.now - timedelta(minutes=REPLAY_MINUTES - 1 - step)
+        window = ctx.store.orders_between(refreshed_at - timedelta(minutes=30), refreshed_at)
+        windows.append([details.setdefault(o["id"], order_details(o, ctx.store)) for o in window])
+    shim = StreamlitShim()
+
+    def run():
+        shim.session_state.clear()
+        manager = notification_manager.NotificationManager()
+        for window in windows:
+            manager.check_for_new_sales(window)
+        _check(shim.session_state.get("show_celebration", False), "check_for_new_sales never flagged a new sale.")
+
+    with mock.patch.object(notification_manager, "st", shim):
+        yield run, sum(len(window) for window in windows), "orders"
+
+@contextlib.contextmanager
+def fetcher_main_scenario(ctx):
+    supabase = FakeSupabase({"realtime_data": [{"id": 1, "data": {}}]})
+    env = {
+        "GOOGLE_CREDENTIALS_JSON": json.dumps({"type": "service_account", "project_id": "benchmark"}),
+        "SHOPIFY_CREDENTIALS_JSON": json.dumps(SHOPIFY_CREDS),
+        "SUPABASE_URL": "https://benchmark.supabase.co",
+        "SUPABASE_SERVICE_ROLE_KEY": "service-role-benchmark",
+        "GA_PROPERTY_ID": PROPERTY_ID,
+    }
+    credentials = SimpleNamespace(from_service_account_info=lambda info, **kwargs: info)
+
+    def run():
+        expected_orders = {len(_realtime_window(ctx.store))}
+        with contextlib.redirect_stdout(io.StringIO()):
+            fetcher.main()
+        expected_orders.add(len(_realtime_window(ctx.store)))
+        blob = supabase.tables["realtime_data"][0]["data"]
+        _check(len(blob["ga_data"]) == len(ctx.store.realtime_rows),
+               f"fetcher.main stored {len(blob['ga_data'])} GA rows, expected {len(ctx.store.realtime_rows)}.")
+        _check(len(blob["shopify_orders"]) in expected_orders,
+               f"fetcher.main stored {len(blob['shopify_orders'])} orders, expected {sorted(expected_orders)}.")
+
+    with tempfile.TemporaryDirectory() as workdir, contextlib.ExitStack() as stack:
+        Path(workdir, "marketer_mapping.json").write_text(json.dumps(ctx.store.mapping, ensure_ascii=False), encoding="utf-8")
+        stack.enter_context(mock.patch.dict(os.environ, env))
+        stack.enter_context(mock.patch.object(fetcher, "service_account", SimpleNamespace(Credentials=credentials)))
+        stack.enter_context(mock.patch.object(fetcher, "BetaAnalyticsDataClient", lambda credentials=None, **kwargs: ctx.ga_client))
+        stack.enter_context(mock.patch.object(fetcher, "create_client", lambda url, key: supabase))
+        stack.enter_context(mock.patch.object(fetcher, "requests", ctx.requests))
+        stack.enter_context(contextlib.chdir(workdir))
+        yield run, len(ctx.store.realtime_rows), "GA rows"
+
+# Thứ tự có chủ ý: các kịch bản phụ thuộc cửa sổ 30 phút chạy trước các kịch bản lịch sử chạy lâu
+SCENARIOS = {
+    "realtime": realtime_scenario,
+    "notifications": notifications_scenario,
+    "fetcher_main": fetcher_main_scenario,
+    "historical_summary": _historical_scenario("Summary"),
+    "historical_by_day": _historical_scenario("By Day"),
+}
+
+# ==============================================================================
+# ĐO LƯỜNG VÀ BASELINE
+# ==============================================================================
+
+def calibrate() -> float:
+    """Best of three timings of a fixed JSON and sorting workload, in seconds."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        data = json.loads(json.dumps(CALIBRATION_PAYLOAD))
+        sorted(data, key=lambda d: (d["title"].lower(), -float(d["price"])))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _p20(values: list) -> float:
+    return statistics.quantiles(values, n=5, method="inclusive")[0]
+
+def measure(run, work: int, unit: str, iterations: int) -> dict:
+    """
+    Times `iterations` runs after a warm-up, then traces peak memory on one more run.
+
+    The machine's speed drifts by tens of percent between processes, so each timed
+    run is divided by the calibration workload timed right before and after it.
+    The 20th percentile of that ratio ("score") is what baselines are checked on;
+    raw latencies are reported alongside for reading.
+    """
+    # Lần chạy khởi động: dựng sẵn response GA, import lười, v.v.
+    run()
+    timings, scores = [], []
+    for _ in range(iterations):
+        gc.collect()
+        before = calibrate()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        scores.append(elapsed / ((before + calibrate()) / 2))
+
+    # Đo bộ nhớ ở một lần chạy riêng vì tracemalloc làm chậm đáng kể
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p20 = _p20(timings)
+    return {
+        "score": round(_p20(scores), 4),
+        "p20_s": round(p20, 6),
+        "median_s": round(statistics.median(timings), 6),
+        "max_s": round(max(timings), 6),
+        "throughput_per_s": round(work / p20, 2),
+        "unit": unit,
+        "work": work,
+        "peak_mib": round(peak / 2**20, 4),
+        "iterations": iterations,
+    }
+
+def run_scale(scale, scenarios: list, iterations: int, seed: int, expected_work: dict = None) -> dict:
+    store = build_store(scale, seed=seed)
+    results = {}
+    with ShopifyStub(store, SHOPIFY_CREDS) as stub:
+        ctx = SimpleNamespace(store=store, ga_client=FakeGAClient(store), requests=stub.requests_module())
+        ctx.app = load_app_functions({
+            "st": StreamlitShim(), "requests": ctx.requests, "ga_client": ctx.ga_client, "shopify_creds": SHOPIFY_CREDS,
+            "PROPERTY_ID": PROPERTY_ID, "page_title_map": store.page_title_map, "SYMBOLS": store.symbols,
+        })
+        for name in scenarios:
+            with SCENARIOS[name](ctx) as (run, work, unit):
+                # Khối lượng công việc khác baseline thì số đo không còn so sánh được
+                baseline_work = (expected_work or {}).get(name)
+                _check(baseline_work is None or work == baseline_work,
+                       f"{scale.name}/{name}: workload is {work} {unit} but the baseline was recorded with {baseline_work}; "
+                       f"the synthetic store changed, so re-record baselines with --update-baselines.")
+                results[name] = measure(run, work, unit, iterations)
+            print(format_result(scale.name, name, results[name]), flush=True)
+    return results
+
+def combine_rounds(rounds: list, latency_tolerance: float) -> dict:
+    """
+    Merges results from separate processes into baselines: the median round of
+    each metric, and a per-scenario score tolerance of twice the largest deviation
+    above that median (never below `latency_tolerance`).
+    """
+    combined = {}
+    for scale in rounds[0]:
+        for name in rounds[0][scale]:
+            results = [r[scale][name] for r in rounds]
+            _check(len({r["work"] for r in results}) == 1, f"{scale}/{name}: workload differed between rounds.")
+            baseline = dict(results[0])
+            for key in ("score", "p20_s", "median_s", "max_s", "throughput_per_s", "peak_mib"):
+                baseline[key] = statistics.median(r[key] for r in results)
+            spread = max(r["score"] for r in results) / baseline["score"] - 1
+            baseline["score_tolerance"] = round(max(latency_tolerance, 2 * spread), 3)
+            baseline["rounds"] = len(results)
+            combined.setdefault(scale, {})[name] = baseline
+    return combined
+
+def compare(results: dict, baselines: dict, latency_tolerance: float, memory_tolerance: float):
+    regressions, missing = [], []
+    for scale, scenarios in results.items():
+        for name, result in scenarios.items():
+            baseline = baselines.get(scale, {}).get(name)
+            if not baseline:
+                missing.append(f"{scale}/{name}")
+                continue
+            tolerance = max(latency_tolerance, baseline.get("score_tolerance", 0))
+            if result["score"] > baseline["score"] * (1 + tolerance):
+                regressions.append(f"{scale}/{name}: score {result['score']:.2f} vs baseline {baseline['score']:.2f} "
+                                   f"(+{result['score'] / baseline['score'] - 1:.0%}, allowed +{tolerance:.0%}; "
+                                   f"p20 {result['p20_s'] * 1000:.1f} ms vs {baseline['p20_s'] * 1000:.1f} ms)")
+            if result["peak_mib"] > baseline["peak_mib"] * (1 + memory_tolerance):
+                regressions.append(f"{scale}/{name}: peak memory {result['peak_mib']:.3f} MiB vs baseline {baseline['peak_mib']:.3f} MiB")
+    return regressions, missing
+
+def format_result(scale: str, name: str, result: dict) -> str:
+    return (f"{scale:<7} {name:<20} {result['p20_s'] * 1000:>10.1f} ms  {result['score']:>8.3f}  "
+            f"{result['throughput_per_s']:>12,.0f} {result['unit']}/s  {result['peak_mib']:>8.2f} MiB")
+
+def load_baselines() -> dict:
+    if not BASELINES_PATH.exists():
+        return {"environment": {}, "results": {}}
+    with open(BASELINES_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# ==============================================================================
+# HÀM CHÍNH
+# ==============================================================================
+
+def run_rounds(args) -> list:
+    """Runs the benchmarks once per round, each in a fresh interpreter."""
+    rounds = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for index in range(args.rounds):
+            print(f"Round {index + 1}/{args.rounds}", flush=True)
+            output = Path(workdir, f"round{index}.json")
+            command = [sys.executable, "-m", "benchmarks.run", "--rounds", "1", "--no-check", "--output", str(output),
+                       "--seed", str(args.seed), "--scale", *args.scale, "--scenario", *args.scenario]
+            if args.iterations:
+                command += ["--iterations", str(args.iterations)]
+            subprocess.run(command, check=True, cwd=REPO_ROOT)
+            rounds.append(json.loads(output.read_text(encoding="utf-8")))
+    return rounds
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks with synthetic GA, Shopify and Supabase fixtures.")
+    parser.add_argument("--scale", nargs="+", choices=list(SCALES), default=list(SCALES))
+    parser.add_argument("--scenario", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--iterations", type=int, help="timed runs per scenario (default depends on the scale)")
+    parser.add_argument("--seed", type=int, default=26)
+    parser.add_argument("--rounds", type=int, help="separate processes to run (default 5 with --update-baselines, else 1)")
+    parser.add_argument("--latency-tolerance", type=float, default=0.20,
+                        help="minimum allowed growth of the score, as a fraction; baselines may allow more")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="allowed growth of peak memory, as a fraction")
+    parser.add_argument("--update-baselines", action="store_true", help=f"write results to {BASELINES_PATH.name}")
+    parser.add_argument("--output", help="also write the results as JSON to this path")
+    parser.add_argument("--no-check", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.rounds = args.rounds or (5 if args.update_baselines else 1)
+
+    if args.rounds > 1:
+        rounds = run_rounds(args)
+        results = combine_rounds(rounds, args.latency_tolerance)
+    else:
+        print(f"{'scale':<7} {'scenario':<20} {'p20':>13}  {'score':>8}  {'throughput':>12}  {'peak':>12}")
+        scenarios = [name for name in SCENARIOS if name in args.scenario]
+        baselines = {} if args.update_baselines or args.no_check else load_baselines()["results"]
+        results = {}
+        for name in args.scale:
+            scale = SCALES[name]
+            expected_work = {scenario: b["work"] for scenario, b in baselines.get(name, {}).items()}
+            results[name] = run_scale(scale, scenarios, args.iterations or scale.iterations, args.seed, expected_work)
+        if args.update_baselines:
+            results = combine_rounds([results], args.latency_tolerance)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.no_check:
+        return 0
+
+    baselines = load_baselines()
+    if args.update_baselines:
+        for scale, scale_results in results.items():
+            baselines["results"].setdefault(scale, {}).update(scale_results)
+        baselines["environment"] = {"python": platform.python_version(), "machine": platform.machine(),
+                                    "recorded_at": datetime.now(timezone.utc).strftime("%Y-%m-%d")}
+        with open(BASELINES_PATH, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+            f.write("\n")
+        print(f"Baselines written to {BASELINES_PATH}")
+        return 0
+
+    regressions, missing = compare(results, baselines["results"], args.latency_tolerance, args.memory_tolerance)
+    if missing:
+        print(f"No baseline for {', '.join(missing)}; record one with --update-baselines.")
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if not regressions:
+        print("No regressions against recorded baselines.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import bisect
+import math
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+# ==============================================================================
+# CẤU HÌNH QUY MÔ CỬA HÀNG
+# ==============================================================================
+
+@dataclass(frozen=True)
+class StoreScale:
+    name: str
+    marketers: int
+    symbols_per_marketer: int
+    page_titles: int
+    orders_per_minute: float
+    line_items_per_order: int
+    history_days: int
+    iterations: int
+
+SCALES = {
+    "small": StoreScale("small", marketers=4, symbols_per_marketer=2, page_titles=40, orders_per_minute=0.5, line_items_per_order=2, history_days=3, iterations=30),
+    "medium": StoreScale("medium", marketers=12, symbols_per_marketer=3, page_titles=200, orders_per_minute=2, line_items_per_order=3, history_days=7, iterations=15),
+    "large": StoreScale("large", marketers=30, symbols_per_marketer=4, page_titles=800, orders_per_minute=5, line_items_per_order=4, history_days=7, iterations=7),
+}
+
+BRAND = "PropeLify®"
+STORE_NAME = "ThePropeLify"
+# Shopify trả về created_at theo múi giờ của cửa hàng; báo cáo lịch sử tính theo giờ Việt Nam
+STORE_TZ = timezone(timedelta(hours=-4))
+VN_TZ = timezone(timedelta(hours=7))
+# Khoảng đơn "trực tiếp" ngay trước now, đủ cho replay 60 phút cộng cửa sổ 30 phút
+LIVE_MINUTES = 120
+
+EMOJI_SYMBOLS = ["🌻", "💌", "💟", "💘", "❣️", "💖", "💙", "💛", "♥️", "🌸", "🍀", "⭐", "🔥", "🌈", "🎁",
+                 "💎", "🌙", "☀️", "🍒", "🦋", "🌺", "🍁", "🐚", "🌵", "🍋", "🪐", "🎀", "🧿", "🌼", "🫶"]
+ADJECTIVES = ["Healing", "Crystal", "Organic", "Vintage", "Handmade", "Golden", "Lunar", "Herbal", "Bamboo", "Copper",
+              "Silk", "Ceramic", "Wooden", "Magnetic", "Aroma", "Tibetan", "Solar", "Velvet", "Marble", "Linen"]
+NOUNS = ["Instrument", "Necklace", "Candle", "Bracelet", "Singing Bowl", "Tuning Fork", "Diffuser", "Pillow", "Lamp", "Mat",
+         "Pendant", "Chime", "Journal", "Blanket", "Mug", "Tea Set", "Ring", "Crystal Set", "Incense Holder", "Wall Art"]
+NON_PRODUCT_PAGES = [f"Home – {STORE_NAME}", f"Cart – {STORE_NAME}", "Checkout", f"Search: 0 results found – {STORE_NAME}"]
+
+# ==============================================================================
+# CỬA HÀNG GIẢ LẬP
+# ==============================================================================
+
+@dataclass
+class SyntheticStore:
+    """
+    A deterministic fake store: marketer mapping, GA traffic and Shopify orders.
+
+    Two stores built from the same scale, seed and anchor time are identical, which
+    lets the Shopify stub rebuild its own copy inside a separate process. Orders come
+    in two parts whose contents do not depend on the time of day:
+    `history_days` whole Vietnam-time days (first_day..last_day) with a fixed number
+    of orders each, and evenly spaced "live" orders in the LIVE_MINUTES before `now`.
+    The hours between the two have no orders, and no scenario queries them.
+    """
+    scale: StoreScale
+    seed: int
+    now: datetime
+    first_day: date = None
+    last_day: date = None
+    page_title_map: dict = field(default_factory=dict)
+    landing_page_map: dict = field(default_factory=dict)
+    page_titles: list = field(default_factory=list)
+    title_weights: list = field(default_factory=list)
+    realtime_rows: list = field(default_factory=list)
+    daily_rows: list = field(default_factory=list)
+    orders: list = field(default_factory=list)
+    order_times: list = field(default_factory=list)
+
+    @property
+    def symbols(self) -> list:
+        return sorted(list(self.page_title_map.keys()), key=len, reverse=True)
+
+    @property
+    def mapping(self) -> dict:
+        return {"page_title_mapping": self.page_title_map, "landing_page_mapping": self.landing_page_map}
+
+    def orders_between(self, start: datetime = None, end: datetime = None) -> list:
+        """Returns orders with start <= created_at <= end, oldest first."""
+        lo = bisect.bisect_left(self.order_times, start.timestamp()) if start else 0
+        hi = bisect.bisect_right(self.order_times, end.timestamp()) if end else len(self.orders)
+        return self.orders[lo:hi]
+
+    def history_orders(self) -> list:
+        """Orders from the start of first_day to the end of last_day, Vietnam time."""
+        start = datetime.combine(self.first_day, datetime.min.time(), VN_TZ)
+        return self.orders_between(start, start + timedelta(days=self.scale.history_days, seconds=-1))
+
+def _build_products(rng: random.Random, count: int) -> list:
+    names = [f"{adj} {noun}" for adj in ADJECTIVES for noun in NOUNS]
+    rng.shuffle(names)
+    while len(names) < count:
+        names += [f"{name} Set {len(names)}" for name in names[:count - len(names)]]
+    return [(name, round(rng.uniform(9.0, 89.0), 2)) for name in names[:count]]
+
+def build_store(scale: StoreScale, seed: int = 26, now: datetime = None) -> SyntheticStore:
+    rng = random.Random(f"{scale.name}:{seed}")
+    now = (now or datetime.now(timezone.utc)).replace(microsecond=0)
+    store = SyntheticStore(scale=scale, seed=seed, now=now)
+
+    # Mapping giống marketer_mapping.json: mỗi marketer có mã MKTn, các symbol còn lại
+    # lấy lần lượt từ kho emoji, hết emoji thì dùng mã phụ dạng MKTn-B, MKTn-C, ...
+    marketers = [f"MKT{i}" for i in range(1, scale.marketers + 1)]
+    emojis = iter(EMOJI_SYMBOLS)
+    for marketer in marketers:
+        store.page_title_map[marketer] = marketer
+        store.landing_page_map[f"sku-{marketer.lower()}"] = marketer
+        for extra in range(1, scale.symbols_per_marketer):
+            store.page_title_map[next(emojis, f"{marketer}-{chr(ord('A') + extra)}")] = marketer
+    symbols = list(store.page_title_map.keys())
+
+    # Tiêu đề trang: sản phẩm x symbol, cộng vài trang không phải sản phẩm
+    products = _build_products(rng, max(5, math.ceil(scale.page_titles / 3)))
+    pairs = rng.sample([(p, s) for p in products for s in symbols], scale.page_titles - len(NON_PRODUCT_PAGES))
+    store.page_titles = [f"{BRAND} {name} {symbol} – {STORE_NAME}" for (name, _), symbol in pairs] + NON_PRODUCT_PAGES
+    rng.shuffle(store.page_titles)
+    store.title_weights = [1 / (rank + 1) ** 0.8 for rank in range(len(store.page_titles))]
+    line_items = [(f"{BRAND} {name} {symbol}", price, f"sku-{store.page_title_map[symbol].lower()}") for (name, price), symbol in pairs]
+    item_weights = [store.title_weights[store.page_titles.index(f"{title} – {STORE_NAME}")] for title, _, _ in line_items]
+
+    # GA realtime: (title, minutesAgo, activeUsers, screenPageViews)
+    for minutes_ago in range(30):
+        for title, weight in zip(store.page_titles, store.title_weights):
+            if rng.random() < min(1.0, 0.1 + weight):
+                users = 1 + int(rng.expovariate(1 / (1 + 10 * weight)))
+                store.realtime_rows.append((title, minutes_ago, users, users + rng.randint(0, users)))
+
+    # Các ngày lịch sử: trọn ngày giờ Việt Nam, kết thúc trước khoảng đơn trực tiếp
+    store.last_day = (now - timedelta(minutes=LIVE_MINUTES)).astimezone(VN_TZ).date() - timedelta(days=1)
+    store.first_day = store.last_day - timedelta(days=scale.history_days - 1)
+
+    # GA lịch sử: (title, date, sessions, totalUsers) cho từng ngày lịch sử
+    for offset in range(scale.history_days):
+        day = store.first_day + timedelta(days=offset)
+        for title, weight in zip(store.page_titles, store.title_weights):
+            sessions = int(rng.expovariate(1 / (1 + 400 * weight)))
+            if sessions:
+                store.daily_rows.append((title, day, sessions, max(1, int(sessions * rng.uniform(0.7, 1.0)))))
+
+    # Đơn hàng lịch sử: số đơn cố định mỗi ngày, giờ đặt ngẫu nhiên trong ngày
+    orders = []
+    for offset in range(scale.history_days):
+        midnight = datetime.combine(store.first_day + timedelta(days=offset), datetime.min.time(), VN_TZ).timestamp()
+        for second in sorted(rng.randrange(86400) for _ in range(round(scale.orders_per_minute * 1440))):
+            orders.append(_build_order(rng, midnight + second, line_items, item_weights, scale))
+
+    # Đơn trực tiếp: cách đều nhau lùi từ now, sinh từ một dãy ngẫu nhiên riêng
+    live_rng = random.Random(f"{scale.name}:{seed}:live")
+    interval = 60 / scale.orders_per_minute
+    live = [_build_order(live_rng, now.timestamp() - k * interval, line_items, item_weights, scale)
+            for k in range(round(scale.orders_per_minute * LIVE_MINUTES))]
+    orders += live[::-1]
+
+    for index, order in enumerate(orders):
+        order["id"] = 5_000_000_000 + index
+        for item_index, item in enumerate(order["line_items"]):
+            item["id"] = 14_000_000_000 + index * 16 + item_index
+        store.orders.append(order)
+        store.order_times.append(datetime.fromisoformat(order["created_at"]).timestamp())
+    return store
+
+def _build_order(rng: random.Random, timestamp: float, line_items: list, item_weights: list, scale: StoreScale) -> dict:
+    items = []
+    for title, price, sku in rng.choices(line_items, weights=item_weights, k=rng.randint(1, 2 * scale.line_items_per_order - 1)):
+        items.append({"title": title, "price": f"{price:.2f}", "quantity": rng.choice((1, 1, 1, 2, 3)), "sku": sku})
+    subtotal = sum(float(item["price"]) * item["quantity"] for item in items)
+    shipping = rng.choice(("0.00", "4.99", "6.99"))
+    return {
+        "created_at": datetime.fromtimestamp(int(timestamp), STORE_TZ).isoformat(),
+        "subtotal_price": f"{subtotal:.2f}",
+        "total_shipping_price_set": {"shop_money": {"amount": shipping, "currency_code": "USD"},
+                                     "presentment_money": {"amount": shipping, "currency_code": "USD"}},
+        "currency": "USD",
+        "financial_status": "paid",
+        "line_items": items,
+    }
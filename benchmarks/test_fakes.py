@@ -0,0 +1,134 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from google.analytics.data_v1beta.types import (DateRange, Dimension, Metric, MinuteRange,
+                                                  RunRealtimeReportRequest, RunReportRequest)
+
+from benchmarks.fakes import FakeGAClient, ShopifyStub
+from benchmarks.stores import SCALES, build_store
+
+CREDS = {"store_url": "test-store.myshopify.com", "api_version": "2024-01", "access_token": "shpat_test"}
+ORDERS_URL = f"https://{CREDS['store_url']}/admin/api/{CREDS['api_version']}/orders.json"
+HEADERS = {"X-Shopify-Access-Token": CREDS["access_token"]}
+
+@pytest.fixture(scope="module")
+def store():
+    return build_store(SCALES["small"])
+
+@pytest.fixture(scope="module")
+def shopify(store):
+    with ShopifyStub(store, CREDS) as stub:
+        yield stub.requests_module()
+
+def _fetch_all(shopify, params):
+    """Pages through orders.json the way app.py does, returning orders and request count."""
+    url, orders, requests_made = ORDERS_URL, [], 0
+    while url:
+        response = shopify.get(url, headers=HEADERS, params=params)
+        response.raise_for_status()
+        requests_made += 1
+        orders += response.json()["orders"]
+        url, params = None, None
+        for link in shopify.utils.parse_header_links(response.headers.get("Link", "")):
+            if link.get("rel") == "next":
+                url = link["url"]
+    return orders, requests_made
+
+# ==============================================================================
+# CỬA HÀNG GIẢ LẬP
+# ==============================================================================
+
+def test_workload_does_not_depend_on_time_of_day():
+    def workload(now):
+        store = build_store(SCALES["small"], now=now)
+        replay = [len(store.orders_between(store.now - timedelta(minutes=m + 30), store.now - timedelta(minutes=m))) for m in range(60)]
+        return [order["line_items"] for order in store.history_orders()], replay
+
+    midnight = datetime(2026, 10, 19, tzinfo=timezone.utc)
+    assert len({repr(workload(midnight + timedelta(hours=hour, minutes=17))) for hour in range(0, 24, 5)}) == 1
+
+# ==============================================================================
+# SHOPIFY
+# ==============================================================================
+
+def test_pagination_returns_exactly_the_orders_in_range_newest_first(store, shopify):
+    start, end = store.now - timedelta(days=2), store.now - timedelta(hours=6)
+    orders, requests_made = _fetch_all(shopify, {"created_at_min": start.isoformat(), "created_at_max": end.isoformat(), "limit": 250})
+
+    expected = [order["id"] for order in reversed(store.orders_between(start, end))]
+    ids = [order["id"] for order in orders]
+    assert ids == expected
+    assert len(set(ids)) == len(ids)
+    assert requests_made == -(-len(expected) // 250) > 1
+
+def test_default_limit_and_fields(store, shopify):
+    since = store.now - timedelta(minutes=300)
+    response = shopify.get(ORDERS_URL, headers=HEADERS, params={"created_at_min": since.isoformat(), "fields": "id,created_at"})
+
+    expected = [order["id"] for order in reversed(store.orders_between(since))][:50]
+    assert [order["id"] for order in response.json()["orders"]] == expected
+    assert all(set(order) == {"id", "created_at"} for order in response.json()["orders"])
+    assert 'rel="next"' in response.headers["Link"]
+
+def test_page_info_rejects_other_filters(shopify):
+    first = shopify.get(ORDERS_URL, headers=HEADERS, params={"limit": 10})
+    next_url = shopify.utils.parse_header_links(first.headers["Link"])[0]["url"]
+
+    assert shopify.get(next_url, headers=HEADERS).status_code == 200
+    assert shopify.get(next_url, headers=HEADERS, params={"status": "any"}).status_code == 400
+
+def test_rejects_wrong_access_token(shopify):
+    assert shopify.get(ORDERS_URL, headers={"X-Shopify-Access-Token": "wrong"}).status_code == 401
+
+# ==============================================================================
+# GOOGLE ANALYTICS
+# ==============================================================================
+
+def _realtime(store, dimensions, metrics, ranges=((29, 0),)):
+    request = RunRealtimeReportRequest(
+        property="properties/1", dimensions=[Dimension(name=d) for d in dimensions], metrics=[Metric(name=m) for m in metrics],
+        minute_ranges=[MinuteRange(start_minutes_ago=start, end_minutes_ago=end) for start, end in ranges])
+    response = FakeGAClient(store).run_realtime_report(request)
+    assert response.row_count == len(response.rows)
+    return [([v.value for v in row.dimension_values], [int(v.value) for v in row.metric_values]) for row in response.rows]
+
+def test_realtime_per_minute_totals(store):
+    expected = Counter()
+    for _, minutes_ago, users, _ in store.realtime_rows:
+        expected[f"{minutes_ago:02d}"] += users
+
+    rows = _realtime(store, ["minutesAgo"], ["activeUsers"])
+    assert {dims[0]: metrics[0] for dims, metrics in rows} == dict(expected)
+
+def test_realtime_per_title_totals(store):
+    users, views = Counter(), Counter()
+    for title, _, row_users, row_views in store.realtime_rows:
+        users[title] += row_users
+        views[title] += row_views
+
+    rows = _realtime(store, ["unifiedScreenName"], ["activeUsers", "screenPageViews"])
+    assert {dims[0]: metrics for dims, metrics in rows} == {title: [users[title], views[title]] for title in users}
+
+def test_realtime_minute_ranges(store):
+    rows = _realtime(store, [], ["activeUsers"], ranges=((29, 0), (4, 0)))
+
+    assert rows == [
+        (["date_range_0"], [sum(row[2] for row in store.realtime_rows)]),
+        (["date_range_1"], [sum(row[2] for row in store.realtime_rows if row[1] <= 4)]),
+    ]
+
+def test_report_per_day_totals(store):
+    days = sorted({row[1] for row in store.daily_rows})
+    start, end = days[1], days[-1]
+    expected = Counter()
+    for title, day, sessions, _ in store.daily_rows:
+        if start <= day <= end:
+            expected[(title, day.strftime("%Y%m%d"))] += sessions
+
+    request = RunReportRequest(
+        property="properties/1", dimensions=[Dimension(name="pageTitle"), Dimension(name="date")],
+        metrics=[Metric(name="sessions")], date_ranges=[DateRange(start_date=str(start), end_date=str(end))], limit=50000)
+    response = FakeGAClient(store).run_report(request)
+    assert {(row.dimension_values[0].value, row.dimension_values[1].value): int(row.metric_values[0].value)
+            for row in response.rows} == dict(expected)